@@ -0,0 +1,122 @@
+import functools
+import hashlib
+import inspect
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
+
+import cadquery as cq
+
+CACHE_DIR = Path("stl/.cache")
+
+
+def cache_key(builder: Callable[..., Any], *params: Any) -> str | None:
+    """
+    Derive a short cache key for a build step.
+
+    The key covers the source of the module that defines `builder`, so
+    editing the geometry code invalidates old entries just like changing
+    one of the input parameters does. Keep cached builders in their own
+    modules so that unrelated edits do not invalidate them.
+
+    Args:
+        builder: Function that produces the cached shape.
+        *params: Everything else the result depends on (values, other keys).
+
+    Returns:
+        Hex digest identifying the build step, or None if the builder has no
+        source file (e.g. code executed from a string), which disables caching.
+    """
+    try:
+        source = inspect.getsource(inspect.getmodule(builder))
+    except (OSError, TypeError):
+        return None
+    payload = repr((builder.__qualname__, source, params))
+    return hashlib.blake2b(payload.encode()).hexdigest()[:16]
+
+
+def load_or_build(key: str | None, build: Callable[[], cq.Shape]) -> cq.Shape:
+    """
+    Return the shape stored under `key`, building and storing it on a miss.
+
+    Entries are written to a temporary file and moved into place, so an
+    interrupted run never leaves a partial entry behind. A file that still
+    cannot be read is treated as a miss and overwritten.
+
+    Args:
+        key: Cache key, typically from `cache_key`. None builds uncached.
+        build: Zero-argument callable that creates the shape.
+
+    Returns:
+        The cached or freshly built shape.
+    """
+    if key is None:
+        return build()
+
+    cache_file = CACHE_DIR / f"{key}.brep"
+    if cache_file.exists():
+        try:
+            return cq.Shape.importBrep(str(cache_file))
+        except Exception:
+            # OCCT reports corrupt BRep data through a variety of unrelated
+            # exception types; any of them just means the entry is unusable
+            pass
+
+    shape = build()
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=CACHE_DIR, suffix=".brep.tmp")
+    os.close(fd)
+    try:
+        shape.exportBrep(tmp_name)
+        os.replace(tmp_name, cache_file)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return shape
+
+
+def call_key(builder: Callable[..., Any], *args: Any, **kwargs: Any) -> str | None:
+    """
+    Cache key for calling `builder` with the given arguments.
+
+    The arguments are bound to the builder's signature with defaults applied,
+    so positional and keyword calls share entries. Shape arguments can be
+    passed as the cache key of the step that produces them.
+
+    Args:
+        builder: Function that produces the cached shape.
+        *args, **kwargs: Arguments of the call.
+
+    Returns:
+        Hex digest identifying the call, or None as for `cache_key`.
+    """
+    bound = inspect.signature(builder).bind(*args, **kwargs)
+    bound.apply_defaults()
+    return cache_key(builder, sorted(bound.arguments.items()))
+
+
+def brep_cached(builder: Callable[..., cq.Shape]) -> Callable[..., cq.Shape]:
+    """
+    Decorator that caches a shape builder's result on disk.
+
+    Calls are keyed by `call_key`. The wrapper also exposes `key()`, which
+    takes the same arguments and returns the cache key, so that dependent
+    build steps can chain their own keys onto it.
+
+    Args:
+        builder: Function returning a cq.Shape from hashable parameters.
+
+    Returns:
+        The caching wrapper.
+    """
+
+    def key(*args: Any, **kwargs: Any) -> str | None:
+        return call_key(builder, *args, **kwargs)
+
+    @functools.wraps(builder)
+    def wrapper(*args: Any, **kwargs: Any) -> cq.Shape:
+        return load_or_build(key(*args, **kwargs), lambda: builder(*args, **kwargs))
+
+    wrapper.key = key
+    return wrapper
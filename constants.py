@@ -19,9 +19,6 @@ outlet_inner_width: float = (
 
 inlet_outer_diameter: float = inlet_inner_diameter + (2 * wall_thickness)
 
-# Define a small overlap distance to ensure boolean operations (union/cut) work reliably
-overlap: float = 0.01  # mm
-
 # Lofting parameters
 num_loft_sections: int = 40  # Number of intermediate sections for loft smoothness (adjust for quality vs computation)
 num_rectangles: float = 10.0  # Superellipse exponent for rectangle approximation (higher => sharper corners)
@@ -0,0 +1,55 @@
+import cadquery as cq
+
+
+def make_flange(
+    base_object: cq.Workplane,
+    flange_size: float,
+    flange_thickness: float,
+    mounting_hole_spacing: float,
+    mounting_hole_diameter: float,
+    inner_diameter: float,
+    flange_corner_radius: float,
+) -> cq.Workplane:
+    """
+    Creates a flange with mounting holes and a central opening.
+
+    Args:
+        base_object: The base object to attach the flange to
+        flange_size: Width and height of the square flange
+        flange_thickness: Thickness of the flange
+        mounting_hole_spacing: Distance between mounting holes
+        mounting_hole_diameter: Diameter of the mounting holes
+        inner_diameter: Diameter of the central hole
+        flange_corner_radius: Fillet radius of the flange corners
+
+    Returns:
+        cq.Workplane: base_object with created flange
+    """
+    # Mounting holes sit on the corners of a square centred on the flange
+    half_spacing = mounting_hole_spacing / 2.0
+    hole_positions = [
+        (x, y)
+        for x in (-half_spacing, half_spacing)
+        for y in (-half_spacing, half_spacing)
+    ]
+
+    # Create flange with the central and mounting holes already in its outline
+    sk = (
+        cq.Sketch()
+        .rect(flange_size, flange_size)  # square
+        .vertices()  # grab the 4 corner vertices
+        .fillet(flange_corner_radius)  # 2D fillet them
+        .push([(0, 0)])
+        .circle(inner_diameter / 2.0, mode="s")  # central hole for the duct
+        .push(hole_positions)
+        .circle(mounting_hole_diameter / 2.0, mode="s")  # mounting holes
+    )
+    with_flange = (
+        cq.Workplane(obj=base_object)
+        .faces(">X")
+        .workplane(centerOption="CenterOfBoundBox")
+        .placeSketch(sk)
+        .extrude(flange_thickness)
+    )
+
+    return with_flange
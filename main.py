@@ -13,13 +13,14 @@ from constants import (
     num_rectangles,
     num_loft_sections,
     num_points_superellipse,
-    overlap,
     flange_size,
     flange_thickness,
     mounting_hole_spacing,
     mounting_hole_diameter,
     flange_corner_radius,
 )
+from brep_cache import call_key, load_or_build
+from flange import make_flange
 from lay_flat_on_bottom import lay_flat_on_bottom
 from transition import make_transition_duct
 
@@ -58,65 +59,10 @@ def print_bb(wp: cq.Workplane, label: str = "Bounding box") -> None:
 # --------------------------------------------------------------------------- #
 
 
-def make_flange(
-    base_object: cq.Workplane,
-    flange_size: float,
-    flange_thickness: float,
-    mounting_hole_spacing: float,
-    mounting_hole_diameter: float,
-    inner_diameter: float,
-) -> cq.Workplane:
-    """
-    Creates a flange with mounting holes and a central opening.
-
-    Args:
-        base_object: The base object to attach the flange to
-        flange_size: Width and height of the square flange
-        flange_thickness: Thickness of the flange
-        mounting_hole_spacing: Distance between mounting holes
-        mounting_hole_diameter: Diameter of the mounting holes
-        inner_diameter: Diameter of the central hole
-
-    Returns:
-        cq.Workplane: base_object with created flange
-    """
-    # Create flange
-    sk = (
-        cq.Sketch()
-        .rect(flange_size, flange_size)  # square
-        .vertices()  # grab the 4 corner vertices
-        .fillet(flange_corner_radius)  # 2D fillet them
-    )
-    with_flange = (
-        cq.Workplane(obj=base_object)
-        .faces(">X")
-        .workplane(centerOption="CenterOfBoundBox")
-        .placeSketch(sk)
-        .extrude(flange_thickness)
-    )
-
-    # Add mounting holes to the flange
-    with_flange = (
-        with_flange.rect(
-            mounting_hole_spacing, mounting_hole_spacing, forConstruction=True
-        )
-        .vertices()
-        .circle(mounting_hole_diameter / 2.0)
-        .cutThruAll()
-    )
-    # Add central hole for the duct
-    with_flange = (
-        with_flange.faces(">X")
-        .workplane(centerOption="CenterOfBoundBox")
-        .hole(inner_diameter, flange_thickness)
-    )
-
-    return with_flange
-
-
 def add_door_cutout(
     wp: cq.Workplane,
     floor_tol: float = 1.0,
+    num_slabs: int = 1,
 ) -> cq.Workplane:
     """
     Remove the overhanging bit that would interfere with the door.
@@ -124,23 +70,35 @@ def add_door_cutout(
     The algorithm:
     1)  Collect vertices that are on the “floor” (Z < floor_tol).
     2)  Take the minimal X among those vertices.
-    3)  Build an oversized rectangular prism on the Y-Z plane at that X.
-    4)  Perform a boolean cut and return the result.
+    3)  Build an oversized box ending on the Y-Z plane at that X,
+        split into `num_slabs` slabs along Y.
+    4)  Cut the slabs one after another and return the result.
+
+    Splitting the cutter bounds the number of edges each Boolean has to
+    intersect. On the current duct a single cutter is still the fastest.
     """
+    if num_slabs < 1:
+        raise ValueError(f"num_slabs must be at least 1, got {num_slabs}")
+
     # Locate the cutting plane
     bottom_vertices = [v for v in wp.vertices() if v.Z < floor_tol]
     min_x = min(bottom_vertices, key=lambda v: v.X).X
 
-    # Construct a generous cutting solid
+    # Construct generous cutting slabs side by side along Y
     bb = bounding_box(wp)
-    cutting_plane = (
-        cq.Workplane("YZ", origin=(min_x, 0, 0))
-        .rect(bb.ylen * 2, bb.zlen * 2)  #  oversize rectangle
-        .extrude(-bb.xlen * 2)  #  extrude through part
-    )
+    slab_width = bb.ylen * 2 / num_slabs
+    for i in range(num_slabs):
+        slab = cq.Solid.makeBox(
+            bb.xlen * 2,  #  reaches through the part along -X
+            slab_width,
+            bb.zlen * 2,
+            pnt=cq.Vector(min_x - bb.xlen * 2, -bb.ylen + slab_width * i, -bb.zlen),
+        )
+
+        # Remove the part that would interfere with the door
+        wp = wp.cut(slab)
 
-    # Remove the part that would interfere with the door
-    return wp.cut(cutting_plane)
+    return wp
 
 
 # --------------------------------------------------------------------------- #
@@ -151,7 +109,7 @@ def build_transition_duct() -> cq.Workplane:
     Compose the final model step by step and return the finished Workplane.
     """
     # Core duct body
-    duct_solid = make_transition_duct(
+    duct_params = dict(
         duct_transition_length=duct_transition_length,
         inlet_outer_diameter=inlet_outer_diameter,
         inlet_inner_diameter=inlet_inner_diameter,
@@ -162,17 +120,29 @@ def build_transition_duct() -> cq.Workplane:
         num_rectangles=num_rectangles,
         num_loft_sections=num_loft_sections,
         num_points_superellipse=num_points_superellipse,
-        overlap=overlap,
     )
 
     # Add flange
-    with_base_flange = make_flange(
-        duct_solid,
-        flange_size,
-        flange_thickness,
-        mounting_hole_spacing,
-        mounting_hole_diameter,
-        inlet_inner_diameter,
+    flange_params = dict(
+        flange_size=flange_size,
+        flange_thickness=flange_thickness,
+        mounting_hole_spacing=mounting_hole_spacing,
+        mounting_hole_diameter=mounting_hole_diameter,
+        inner_diameter=inlet_inner_diameter,
+        flange_corner_radius=flange_corner_radius,
+    )
+    # The duct's cache key stands in for the duct itself, so the duct is only
+    # built or loaded when the flanged entry is missing
+    flange_key = call_key(
+        make_flange, make_transition_duct.key(**duct_params), **flange_params
+    )
+    with_base_flange = cq.Workplane(
+        obj=load_or_build(
+            flange_key,
+            lambda: make_flange(
+                make_transition_duct(**duct_params), **flange_params
+            ).val(),
+        )
     )
 
     # Orient so that the bottom faces lie on the XY plane
@@ -1,46 +1,75 @@
-from math import pi, sin, cos, copysign, gamma, sqrt
+from functools import lru_cache
+from math import exp, isclose, lgamma, pi
 import cadquery as cq
+import numpy as np
+from OCP.BRepBuilderAPI import BRepBuilderAPI_MakeEdge
+from OCP.BRepOffsetAPI import BRepOffsetAPI_ThruSections
+from OCP.gp import gp_Ax2, gp_Circ, gp_Dir, gp_Elips, gp_Pnt
+
+from brep_cache import brep_cached
 
 
 # Geometry helpers
-def _superellipse_point(t: float, a: float, b: float, n: float) -> tuple[float, float]:
+@lru_cache(maxsize=64)
+def _unit_profile(n: float, num_points: int) -> np.ndarray:
     """
-    Calculates a point (x, y) on a superellipse for a given angle t (radians).
+    Points of a super-ellipse with unit semi-axes.
+
+    Cached per exponent so that sections sharing the same `n` only scale the
+    result instead of re-evaluating the trigonometry and powers.
 
     Args:
-        t (float): Angle in radians (0 to 2*pi).
-        a (float): Semi-axis length along the x-axis.
-        b (float): Semi-axis length along the y-axis.
-        n (float): Exponent controlling the shape (n=2 is ellipse, n->inf is rectangle).
+        n: Super-ellipse exponent (n=2 is ellipse, n->inf is rectangle).
+        num_points: Number of points on the curve.
 
     Returns:
-        tuple: (x, y) coordinates of the point on the superellipse.
+        Read-only (num_points, 2) array of (y, z) coordinates.
     """
-    cos_t: float = cos(t)
-    sin_t: float = sin(t)
-    # Parametric form: x = a*sign(cos t)*|cos t|^(2/n), y = b*sign(sin t)*|sin t|^(2/n)
-    term_x: float = copysign(abs(cos_t) ** (2.0 / n), cos_t) if cos_t != 0 else 0.0
-    term_y: float = copysign(abs(sin_t) ** (2.0 / n), sin_t) if sin_t != 0 else 0.0
-    return (a * term_x, b * term_y)
+    t: np.ndarray = np.linspace(0.0, 2 * pi, num_points, endpoint=False)
+    cos_t: np.ndarray = np.cos(t)
+    sin_t: np.ndarray = np.sin(t)
+    # Parametric form: x = sign(cos t)*|cos t|^(2/n), y = sign(sin t)*|sin t|^(2/n)
+    p: float = 2.0 / n
+    unit: np.ndarray = np.column_stack(
+        (np.sign(cos_t) * np.abs(cos_t) ** p, np.sign(sin_t) * np.abs(sin_t) ** p)
+    )
+    unit.setflags(write=False)
+    return unit
 
 
-def _build_profile(
-    a: float, b: float, n: float, num_points: int
-) -> list[tuple[float, float]]:
+def _build_profile(a: float, b: float, n: float, num_points: int) -> list[list[float]]:
     """
     Build a closed polyline approximating a super-ellipse.
 
     Args:
         a: Semi-axis along Y.
         b: Semi-axis along Z.
-        n: Super-ellipse exponent.
+        n: Super-ellipse exponent, rounded to 4 decimals for cache reuse.
         num_points: Number of points to use for the polyline.
 
     Returns:
-        List of (y, z) tuples for Workplane.polyline().
+        List of [y, z] pairs describing the closed cross-section.
+    """
+    unit: np.ndarray = _unit_profile(round(n, 4), num_points)
+    return (unit * (a, b)).tolist()
+
+
+@lru_cache(maxsize=256)
+def _superellipse_area_factor(n: float) -> float:
+    """
+    Shape factor k(n) of the super-ellipse area A = k(n) * a * b.
+
+    k = 4 * Γ(1 + 1/n)^2 / Γ(1 + 2/n), evaluated through log-gamma so large
+    exponents cannot overflow. Cached because the outer and inner shells
+    interpolate `n` over the same stations.
+
+    Args:
+        n: Exponent.
+
+    Returns:
+        Area factor for unit semi-axes.
     """
-    step: float = 2 * pi / num_points
-    return [_superellipse_point(step * i, a, b, n) for i in range(num_points)]
+    return 4.0 * exp(2.0 * lgamma(1.0 + 1.0 / n) - lgamma(1.0 + 2.0 / n))
 
 
 def _superellipse_area(a: float, b: float, n: float) -> float:
@@ -56,12 +85,59 @@ def _superellipse_area(a: float, b: float, n: float) -> float:
     Returns:
         Cross-sectional area.
     """
-    k: float = 4.0 * gamma(1.0 + 1.0 / n) ** 2 / gamma(1.0 + 2.0 / n)
-    return k * a * b
+    return _superellipse_area_factor(n) * a * b
+
+
+def _section_wire(x: float, a: float, b: float, n: float, num_points: int) -> cq.Wire:
+    """
+    Build one closed cross-section wire on the plane X = x.
+
+    Elliptic sections (n = 2) are made of analytic circle or ellipse arcs,
+    all others of straight segments. Either way the wire has `num_points`
+    edges with vertices at the same curve parameters, so neighbouring
+    sections pair up edge by edge in the loft.
+
+    Args:
+        x: Position of the section along the duct.
+        a: Semi-axis along Y.
+        b: Semi-axis along Z.
+        n: Super-ellipse exponent.
+        num_points: Number of edges of the wire.
+
+    Returns:
+        Closed wire of the cross-section.
+    """
+    if isclose(n, 2.0):
+        # For n = 2 the profile parameter t is the ellipse's eccentric anomaly;
+        # OCCT wants the major axis as X direction, which shifts t when b > a
+        if a >= b:
+            axes = gp_Ax2(gp_Pnt(x, 0, 0), gp_Dir(1, 0, 0), gp_Dir(0, 1, 0))
+            t_offset = 0.0
+        else:
+            axes = gp_Ax2(gp_Pnt(x, 0, 0), gp_Dir(1, 0, 0), gp_Dir(0, 0, 1))
+            t_offset = pi / 2
+        curve = (
+            gp_Circ(axes, a) if isclose(a, b) else gp_Elips(axes, max(a, b), min(a, b))
+        )
+
+        t: list[float] = np.linspace(0.0, 2 * pi, num_points + 1).tolist()
+        return cq.Wire.assembleEdges(
+            [
+                cq.Edge(
+                    BRepBuilderAPI_MakeEdge(curve, t0 - t_offset, t1 - t_offset).Edge()
+                )
+                for t0, t1 in zip(t[:-1], t[1:])
+            ]
+        )
+
+    profile: list[list[float]] = _build_profile(a, b, n, num_points)
+
+    # Place the (y, z) profile directly on the plane X = x
+    return cq.Wire.makePolygon([(x, y, z) for y, z in profile], close=True)
 
 
 # Loft builder
-def _loft_between_ends(
+def _section_wires(
     length: float,
     a_in: float,
     b_in: float,
@@ -71,75 +147,94 @@ def _loft_between_ends(
     n_out_local: float,
     num_loft_sections: int,
     num_points: int,
-    offset_start: float = 0.0,
-    offset_end: float = 0.0,
-) -> cq.Solid:
+) -> list[cq.Wire]:
     """
-    Create a solid by lofting between two super-ellipse cross-sections.
+    Create the cross-section wires of a loft between two super-ellipses.
 
-    The loft grows along +X, with X = 0 at the rectangular outlet and
+    The sections advance along +X, with X = 0 at the rectangular outlet and
     X = `length` at the round inlet.
 
     Args:
-        length: Total nominal length of the loft.
+        length: Total length of the loft.
         a_in, b_in, n_in: Super-ellipse parameters at the **inlet** (round).
         a_out, b_out, n_out_local: Parameters at the **outlet** (rectangular).
         num_loft_sections: Number of intermediate sections for lofting.
-        num_points: Points per cross-section polyline.
-        offset_start: Trim applied to first (outlet) section.
-        offset_end:   Trim applied to last (inlet) section.
+        num_points: Points per cross-section wire.
 
     Returns:
-        CadQuery Solid representing the loft.
+        Closed wires ordered from outlet to inlet.
     """
-    # Effective length after trimming both ends
-    effective_len: float = length - (offset_start + offset_end)
-
-    # Pre-compute X positions of all the work-planes
-    x_positions: list[float] = [
-        offset_start + effective_len * (i / num_loft_sections)
-        for i in range(num_loft_sections + 1)
-    ]
-
     # Pre-compute inlet/outlet areas
     area_in: float = _superellipse_area(a_in, b_in, n_in)
     area_out: float = _superellipse_area(a_out, b_out, n_out_local)
 
-    wp: cq.Workplane = cq.Workplane("YZ")  # Normal points along +X
-    previous_x: float | None = None
+    # Interpolation parameter of every section: 0 → outlet, 1 → inlet
+    s: np.ndarray = np.arange(num_loft_sections + 1) / num_loft_sections
+    x_positions: np.ndarray = length * s
 
-    for i, x in enumerate(x_positions):
-        s: float = i / num_loft_sections  # 0 → outlet, 1 → inlet
+    # Target cross-sectional area (linear taper)
+    area_target: np.ndarray = area_out + (area_in - area_out) * s
 
-        # Target cross-sectional area (linear taper)
-        area_target: float = area_out + (area_in - area_out) * s
+    # Linear interpolation gives a *shape* guess (aspect ratio)
+    a0: np.ndarray = a_out + (a_in - a_out) * s
+    b0: np.ndarray = b_out + (b_in - b_out) * s
+    n: np.ndarray = n_out_local + (n_in - n_out_local) * s
 
-        # Linear interpolation gives a *shape* guess (aspect ratio)
-        a0: float = a_out + (a_in - a_out) * s
-        b0: float = b_out + (b_in - b_out) * s
-        n: float = n_out_local + (n_in - n_out_local) * s
+    # Scale a0, b0 uniformly so that area matches area_target
+    area_guess: np.ndarray = (
+        a0 * b0 * np.array([_superellipse_area_factor(k) for k in n.tolist()])
+    )
+    scale: np.ndarray = np.sqrt(
+        np.divide(
+            area_target,
+            area_guess,
+            out=np.ones_like(area_guess),
+            where=area_guess != 0,
+        )
+    )
+    a: np.ndarray = a0 * scale
+    b: np.ndarray = b0 * scale
 
-        # Scale a0, b0 uniformly so that area matches area_target
-        area_guess: float = _superellipse_area(a0, b0, n)
-        scale: float = sqrt(area_target / area_guess) if area_guess != 0 else 1.0
-        a: float = a0 * scale
-        b: float = b0 * scale
+    wires: list[cq.Wire] = []
 
-        profile: list[tuple[float, float]] = _build_profile(a, b, n, num_points)
+    for x_i, a_i, b_i, n_i in zip(
+        x_positions.tolist(), a.tolist(), b.tolist(), n.tolist()
+    ):
+        wires.append(_section_wire(x_i, a_i, b_i, n_i, num_points))
 
-        if previous_x is None:
-            # First section drawn on the base work-plane
-            wp = wp.polyline(profile).close()
-        else:
-            # Offset a new work-plane along X and draw the next wire
-            wp = wp.workplane(offset=x - previous_x).polyline(profile).close()
+    return wires
 
-        previous_x = x
 
-    # A single loft call stitches all wires into a solid
-    return wp.loft(combine=True, ruled=False).val()
+def _loft_shell(wires: list[cq.Wire], chunk_size: int = 9) -> list[cq.Face]:
+    """
+    Loft an open surface (no end caps) through the given wires.
+
+    The wires are lofted in overlapping windows of `chunk_size` sections that
+    share their boundary wire. ThruSections slows down super-linearly with
+    the number of sections, so several short lofts are cheaper than one long
+    one.
+
+    Args:
+        wires: Cross-section wires in lofting order.
+        chunk_size: Maximum number of sections per loft call.
 
+    Returns:
+        Faces of all the lofted windows, ready to be sewn.
+    """
+    faces: list[cq.Face] = []
+    for start in range(0, len(wires) - 1, chunk_size - 1):
+        # False requests a shell instead of a capped solid
+        loft_builder = BRepOffsetAPI_ThruSections(False, False)
+        for w in wires[start : start + chunk_size]:
+            loft_builder.AddWire(w.wrapped)
+        loft_builder.Build()
 
+        faces.extend(cq.Shell(loft_builder.Shape()).Faces())
+
+    return faces
+
+
+@brep_cached
 def make_transition_duct(
     duct_transition_length: float,
     inlet_outer_diameter: float,
@@ -151,11 +246,13 @@ def make_transition_duct(
     num_rectangles: float,
     num_loft_sections: int,
     num_points_superellipse: int,
-    overlap: float,
 ) -> cq.Solid:
     """
     Build the complete hollow transition duct.
 
+    The wall is assembled directly from the outer and inner lofted surfaces
+    plus two flat rims, so no Boolean is needed to hollow it out.
+
     Args:
         duct_transition_length: Length of the transition duct.
         inlet_outer_diameter: Outer diameter of the inlet (round end).
@@ -167,13 +264,12 @@ def make_transition_duct(
         num_rectangles: Superellipse exponent for rectangular end.
         num_loft_sections: Number of sections for lofting.
         num_points_superellipse: Number of points to use for each cross-section.
-        overlap: Overlap amount for the inner shell.
 
     Returns:
-        CadQuery Solid with wall_thickness walls.
+        CadQuery Solid with wall_thickness walls, open at both ends.
     """
-    # Outside shell
-    outer_solid: cq.Solid = _loft_between_ends(
+    # Outside surface
+    outer_wires: list[cq.Wire] = _section_wires(
         length=duct_transition_length,
         # Inlet (round, outer dimensions)
         a_in=inlet_outer_diameter / 2,
@@ -187,9 +283,9 @@ def make_transition_duct(
         num_points=num_points_superellipse,
     )
 
-    # Inside shell
-    inner_solid: cq.Solid = _loft_between_ends(
-        length=duct_transition_length + overlap,
+    # Inside surface, on the same stations as the outside one
+    inner_wires: list[cq.Wire] = _section_wires(
+        length=duct_transition_length,
         # Inlet (round, inner)
         a_in=inlet_inner_diameter / 2,
         b_in=inlet_inner_diameter / 2,
@@ -200,21 +296,20 @@ def make_transition_duct(
         n_out_local=num_rectangles,
         num_loft_sections=num_loft_sections,
         num_points=num_points_superellipse,
-        # Recessed slightly to guarantee a clean Boolean
-        offset_start=overlap,
-        offset_end=overlap,
     )
 
-    # Hollow part
-    duct_solid: cq.Solid = outer_solid.cut(inner_solid)
-    # Select the inlet face (normal roughly pointing ±X) and cut a hole
-    part_with_hole: cq.Solid = (
-        cq.Workplane(obj=duct_solid)
-        .faces(">X")  # faces whose normal ≈ +X
-        .workplane(centerOption="CenterOfMass")  # place WP on that face
-        .circle((inlet_inner_diameter - overlap) / 2)  # inner diameter
-        .cutBlind(-overlap)  # cut *into* the part
-        .val()
+    # Flat rims closing the wall at the outlet and the inlet
+    outlet_rim: cq.Face = cq.Face.makeFromWires(outer_wires[0], [inner_wires[0]])
+    inlet_rim: cq.Face = cq.Face.makeFromWires(outer_wires[-1], [inner_wires[-1]])
+
+    # Sew everything into a closed shell and turn it into the hollow part
+    wall: cq.Shell = cq.Shell.makeShell(
+        [
+            outlet_rim,
+            *_loft_shell(outer_wires),
+            *_loft_shell(inner_wires),
+            inlet_rim,
+        ]
     )
 
-    return part_with_hole
+    return cq.Solid.makeSolid(wall)